@@ -9,7 +9,10 @@ your Steam ID.
 Attributes:
     API_KEY (str): Placeholder for API key. Replace with your actual API key.
     STEAM_ID (str): Placeholder for Steam ID. Replace with your actual Steam ID.
+    DATA_COMPRESSION (str or None): Compression for new data files: None (plain JSON),
+                                    'gzip', or 'zstd' (requires the zstandard package).
 """
 
 API_KEY = 'YOUR_KEY_HERE'
 STEAM_ID = 'YOUR_ID_HERE'
+DATA_COMPRESSION = None
@@ -7,21 +7,27 @@ manage no-achievement game lists, and handle file operations.
 
 Functions:
     - load_existing_appids(steamid): Retrieve existing Steam AppIDs from JSON files.
-    - save_to_json(data, steamid): Save scraped data to JSON file sorted by rarest achievement.
+    - save_to_json(data, steamid): Save scraped data to JSON file sorted by rarest achievement
+      and update the user's ranked views.
     - save_appids_without_achievements(appids): Append new achievement-less AppIDs to a JSON file.
     - update_no_achievements(appids, num_games, progress_bar): Update the no-achievements list.
 
 Dependencies:
-    - json: Module for JSON file operations.
     - os: Module for operating system functions.
+    - storage: Reading and writing of (optionally compressed) JSON data files.
     - steam_utils: Utility functions for interacting with the Steam API.
+    - game_record: Compact record type for a single game.
+    - ranked_views: Maintained ranked index files for a user's games.
     - tqdm: Progress bar library for visual feedback.
 """
 
-import json
 import os
+from bisect import bisect_right
 
 from steam_utils import get_game_achievement_data
+from game_record import GameRecord
+from ranked_views import get_user_file_state, update_ranked_views
+from storage import data_file_exists, read_json, write_json, lock_data_file
 
 DATA_DIR = 'data'
 NO_ACHIEVEMENTS_PATH = os.path.join(DATA_DIR, 'no_achievements.json')
@@ -41,91 +47,101 @@ def load_existing_appids(steamid):
     json_filename = os.path.join(DATA_DIR, f"{steamid}.json")
     existing_appids = set()
 
-    if os.path.isfile(json_filename):
-        with open(json_filename, 'r', encoding='utf-8') as jsonfile:
-            data = json.load(jsonfile)
-            for item in data:
-                appid = int(item['AppID'])
-                existing_appids.add(appid)
+    if data_file_exists(json_filename):
+        data = read_json(json_filename)
+        for item in data:
+            appid = int(item['AppID'])
+            existing_appids.add(appid)
 
-    if os.path.isfile(NO_ACHIEVEMENTS_PATH):
-        with open(NO_ACHIEVEMENTS_PATH, 'r', encoding='utf-8') as jsonfile:
-            data = json.load(jsonfile)
-            for appid in data:
-                existing_appids.add(appid)
+    if data_file_exists(NO_ACHIEVEMENTS_PATH):
+        data = read_json(NO_ACHIEVEMENTS_PATH)
+        for appid in data:
+            existing_appids.add(appid)
 
     return existing_appids
 
 
 def save_to_json(data, steamid):
     """
-    Save scraped data to a JSON file for each unique SteamID. Appends to the
-    file if it already exists, and creates the file if it doesn't. Sorts
-    the JSON by rarest achievement when finished.
+    Save scraped data to a JSON file for each unique SteamID. Inserts into the
+    file if it already exists, and creates the file if it doesn't. The file is
+    kept sorted by rarest achievement, so new games are placed with a binary
+    search instead of re-sorting the whole list. The user's ranked views are
+    updated with the new games.
 
     Args:
-        data (list): List of data to be saved to the JSON file.
+        data (list): List of GameRecord objects to be saved to the JSON file.
         steamid (str): The SteamID of the user.
     """
     json_filename = os.path.join(DATA_DIR, f"{steamid}.json")
     existing_data = []
 
-    if os.path.isfile(json_filename):
-        with open(json_filename, 'r', encoding='utf-8') as jsonfile:
-            existing_data = json.load(jsonfile)
+    if data_file_exists(json_filename):
+        existing_data = [GameRecord.from_dict(entry) for entry in read_json(json_filename)]
 
-    existing_data.extend(data)
+    sort_keys = [-float(record.rarest_achievement) for record in existing_data]
+    for record in data:
+        sort_key = -float(record.rarest_achievement)
+        index = bisect_right(sort_keys, sort_key)
+        sort_keys.insert(index, sort_key)
+        existing_data.insert(index, record)
 
-    existing_data.sort(key=lambda x: float(x['Rarest Achievement %']), reverse=True)
+    previous_state = get_user_file_state(steamid)
+    write_json(json_filename, [record.to_dict() for record in existing_data], pretty=True)
 
-    with open(json_filename, 'w', encoding='utf-8') as jsonfile:
-        json.dump(existing_data, jsonfile, indent=4)
+    update_ranked_views(steamid, data, existing_data, previous_state)
 
 
 def save_appids_without_achievements(appids):
     """
-    Add a list of AppIDs without achievements to the JSON file.
+    Add a list of AppIDs without achievements to the JSON file. The file is
+    locked while it is read and written, so AppIDs added by other processes
+    are kept.
 
     Args:
         appids (list): List of AppIDs without achievements.
     """
+    if not appids:
+        return
 
-    existing_appids = []
+    with lock_data_file(NO_ACHIEVEMENTS_PATH):
+        existing_appids = []
 
-    if os.path.isfile(NO_ACHIEVEMENTS_PATH):
-        with open(NO_ACHIEVEMENTS_PATH, 'r', encoding='utf-8') as jsonfile:
-            existing_appids = json.load(jsonfile)
+        if data_file_exists(NO_ACHIEVEMENTS_PATH):
+            existing_appids = read_json(NO_ACHIEVEMENTS_PATH)
 
-    existing_appids.extend(appids)
-    existing_appids = sorted(set(existing_appids))
+        existing_appids.extend(appids)
+        existing_appids = sorted(set(existing_appids))
 
-    with open(NO_ACHIEVEMENTS_PATH, 'w', encoding='utf-8') as jsonfile:
-        json.dump(existing_appids, jsonfile, indent=4)
+        write_json(NO_ACHIEVEMENTS_PATH, existing_appids)
 
 
 def update_no_achievements(appids, num_games, progress_bar):
     """
     Update the list of AppIDs without achievements. This is done with an
-    optional flag at runtime.
+    optional flag at runtime. Only the AppIDs that now have achievements are
+    removed from the current file, so AppIDs added by other processes during
+    the rescan are kept.
 
     Args:
         appids (list): List of AppIDs without achievements.
         num_games (int): The total number of AppIDs to be updated.
         progress_bar (tqdm.tqdm): Progress bar for tracking progress.
     """
-    updated_appids = []
     removed_appids = []
 
     for appid in appids:
         if get_game_achievement_data(appid) is None:
-            updated_appids.append(appid)
             num_games -= 1
         else:
             removed_appids.append(appid)
         progress_bar.update(1)
 
-    with open(NO_ACHIEVEMENTS_PATH, 'w', encoding='utf-8') as jsonfile:
-        json.dump(updated_appids, jsonfile, indent=4)
+    with lock_data_file(NO_ACHIEVEMENTS_PATH):
+        removed = set(removed_appids)
+        updated_appids = [appid for appid in read_json(NO_ACHIEVEMENTS_PATH)
+                          if appid not in removed]
+        write_json(NO_ACHIEVEMENTS_PATH, updated_appids)
 
     print(f"\nRemoved {num_games} appid(s) that now have achievements.")
     if removed_appids:
@@ -0,0 +1,113 @@
+# game_record.py
+"""
+Compact record type for a single game in the Steam Completionist project.
+
+User JSON files and `steam_hltb_map.json` store every game as a dictionary with
+long string keys. `GameRecord` holds the same fields in `__slots__` attributes,
+which keeps large maps and multi-user batches small in memory, and converts to
+and from the JSON schema used on disk.
+
+Classes:
+    - GameRecord: A game's AppID, title, rarest achievement, completion status
+      and HLTB data.
+
+Example Usage:
+    record = GameRecord.from_dict(entry)
+    entry = record.to_dict()
+"""
+
+class GameRecord:
+    """
+    A single game's scraped data.
+
+    Attributes:
+        appid (int): The Steam AppID of the game.
+        title (str): The Steam title of the game.
+        rarest_achievement (float): The percentage of the game's rarest achievement.
+        completed (bool or None): Whether the user has completed all achievements.
+        hltb_id (int or None): The HLTB ID of the game.
+        hltb_title (str or None): The HLTB title of the game.
+        hltb_completionist_time (float or None): The HLTB completionist time.
+    """
+
+    __slots__ = (
+        'appid',
+        'title',
+        'rarest_achievement',
+        'completed',
+        'hltb_id',
+        'hltb_title',
+        'hltb_completionist_time'
+    )
+
+    def __init__(self, appid, title=None, rarest_achievement=None, completed=None,
+                 hltb_id=None, hltb_title=None, hltb_completionist_time=None):
+        self.appid = appid
+        self.title = title
+        self.rarest_achievement = rarest_achievement
+        self.completed = completed
+        self.hltb_id = hltb_id
+        self.hltb_title = hltb_title
+        self.hltb_completionist_time = hltb_completionist_time
+
+    def __repr__(self):
+        return f"GameRecord(appid={self.appid!r}, title={self.title!r})"
+
+    @classmethod
+    def from_dict(cls, entry):
+        """
+        Create a record from a user JSON or `steam_hltb_map.json` entry.
+
+        Args:
+            entry (dict): Dictionary with keys 'AppID', 'Title', 'Rarest Achievement %',
+                          'Completed', 'HLTB ID', 'HLTB Title', 'HLTB Completionist Time'.
+                          Missing keys are set to None.
+
+        Returns:
+            GameRecord: The record for the entry.
+        """
+        return cls(
+            entry.get('AppID'),
+            entry.get('Title'),
+            entry.get('Rarest Achievement %'),
+            entry.get('Completed'),
+            entry.get('HLTB ID'),
+            entry.get('HLTB Title'),
+            entry.get('HLTB Completionist Time')
+        )
+
+    def to_dict(self):
+        """
+        Convert the record to a user JSON file entry.
+
+        Returns:
+            dict: Dictionary with keys 'AppID', 'Title', 'Rarest Achievement %',
+                  'Completed', 'HLTB ID', 'HLTB Title', 'HLTB Completionist Time'.
+        """
+        return {
+            'AppID': self.appid,
+            'Title': self.title,
+            'Rarest Achievement %': self.rarest_achievement,
+            'Completed': self.completed,
+            'HLTB ID': self.hltb_id,
+            'HLTB Title': self.hltb_title,
+            'HLTB Completionist Time': self.hltb_completionist_time
+        }
+
+    def to_map_entry(self):
+        """
+        Convert the record to a `steam_hltb_map.json` entry, which has no
+        user-specific completion status.
+
+        Returns:
+            dict: Dictionary with keys 'AppID', 'Title', 'Rarest Achievement %',
+                  'HLTB ID', 'HLTB Title', 'HLTB Completionist Time'.
+        """
+        return {
+            'AppID': self.appid,
+            'Title': self.title,
+            'Rarest Achievement %': self.rarest_achievement,
+            'HLTB ID': self.hltb_id,
+            'HLTB Title': self.hltb_title,
+            'HLTB Completionist Time': self.hltb_completionist_time
+        }
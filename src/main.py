@@ -6,7 +6,11 @@ This script allows scraping of a Steam user's library to find rarest achievement
 update achievement data, and manage the no-achievement game list.
 
 Usage:
-    python main.py [-s STEAMID] [-v VANITY] [-u] [-m]
+    python main.py [-s STEAMID] [-v VANITY] [-u] [-m] [--stream]
+    python main.py --schedule [--budget REQUESTS] [--tick SECONDS]
+    python main.py [-s STEAMID] [-v VANITY] --top VIEW [--limit N]
+    python main.py --compress {gzip,zstd,none}
+    python main.py --resolve-vanities FILE
 
 Options:
     -s, --steamid           Specify a SteamID to search.
@@ -15,28 +19,50 @@ Options:
                             Check and update no_achievements.json.
     -m, --map-update        Pull info from user files to update steam/hltb map.
     --sort                  Sort the steam_hltb_map.json file.
+    --stream                Scrape games with cached map data first so the ranked
+                            output file fills with useful rows early.
+    --schedule              Keep all tracked users up to date, checking active users
+                            more often, within a request budget per tick.
+    --budget                Steam API request budget per scheduler tick.
+    --tick                  Seconds between scheduler ticks.
+    --top                   Show the top games of a ranked view (rarity, hltb or
+                            uncompleted) from its index file.
+    --limit                 Number of games shown by --top.
+    --compress              Convert all data files to gzip, zstd or plain JSON.
+    --resolve-vanities      Resolve the vanity URLs listed in a file (one per line)
+                            to SteamIDs and cache them.
 
 If no options are provided, it uses STEAM_ID from config.py.
 
 Dependencies:
     - file_utils            Utility functions for file handling.
     - steam_utils           Functions to interact with the Steam API.
+    - scheduler             Adaptive polling schedule for tracked users.
+    - ranked_views          Maintained ranked index files for a user's games.
+    - storage               Reading and writing of (optionally compressed) data files.
     - hltb_utils            Utility functions for How Long to Beat API.
     - tqdm                  Progress bar library for visual feedback.
     - config                Configuration file for API keys and IDs.
 """
 
 import sys
-import json
+import time
+import heapq
 from argparse import ArgumentParser
 from tqdm import tqdm
 from file_utils import (
+    NO_ACHIEVEMENTS_PATH,
     load_existing_appids,
     save_to_json,
     save_appids_without_achievements,
     update_no_achievements
 )
-from steam_utils import get_owned_games, scrape_steam_data, resolve_vanity_url
+from steam_utils import (
+    get_owned_games,
+    scrape_steam_data,
+    resolve_vanity_url,
+    resolve_vanity_urls
+)
 from steam_hltb_mapping import (
     add_new_ids_from_users,
     load_existing_ids,
@@ -44,6 +70,18 @@ from steam_hltb_mapping import (
     update_rarest_achievement_percentages,
     update_hltb_completionist_times
 )
+from scheduler import (
+    REQUESTS_PER_GAME,
+    load_schedule,
+    save_schedule,
+    list_tracked_steamids,
+    build_queue,
+    add_new_users,
+    reschedule_user,
+    retry_user
+)
+from ranked_views import VIEWS, get_top_games
+from storage import read_json, migrate_data_files
 from config import STEAM_ID
 
 def resolve_steamid(args):
@@ -103,6 +141,22 @@ def parse_arguments(parser):
                        help='Update the Rarest Achievement %% for all games')
     group.add_argument('-d', '--update-hltb', action='store_true',
                        help='Update the HLTB Completionist Time for all games')
+    group.add_argument('--schedule', action='store_true',
+                       help='Keep all tracked users up to date on an adaptive schedule')
+    group.add_argument('--compress', choices=['gzip', 'zstd', 'none'],
+                       help='Convert all data files to gzip, zstd or plain JSON')
+    group.add_argument('--resolve-vanities', type=str, metavar='FILE',
+                       help='Resolve and cache the vanity URLs listed in a file')
+    parser.add_argument('--stream', action='store_true',
+                        help='Scrape games already in steam_hltb_map.json first')
+    parser.add_argument('--budget', type=int, default=1000,
+                        help='Steam API request budget per scheduler tick (default: 1000)')
+    parser.add_argument('--tick', type=int, default=3600,
+                        help='Seconds between scheduler ticks (default: 3600)')
+    parser.add_argument('--top', choices=list(VIEWS),
+                        help='Show the top games of a ranked view')
+    parser.add_argument('--limit', type=int, default=10,
+                        help='Number of games shown by --top (default: 10)')
     return parser.parse_args()
 
 def handle_update_no_achievements():
@@ -110,53 +164,187 @@ def handle_update_no_achievements():
     Load the list of AppIDs without achievements from 'data/no_achievements.json',
     update the file with the latest data, and display progress using tqdm.
     """
-    with open("data/no_achievements.json", 'r', encoding='utf-8') as jsonfile:
-        appids = json.load(jsonfile)
+    appids = read_json(NO_ACHIEVEMENTS_PATH)
     num_games = len(appids)
     progress_bar = tqdm(total=num_games, unit='games', ncols=100)
     update_no_achievements(appids, num_games, progress_bar)
 
-def get_new_games(steamid):
+def get_new_games(steamid, owned_games=None):
     """
     Retrieve new games owned by a Steam user that are not already listed in their
     existing AppIDs file.
 
     Args:
         steamid (str): The SteamID of the user.
+        owned_games (list, optional): The user's owned games, if already retrieved
+                                      with `get_owned_games()`.
 
     Returns:
         list: List of dictionaries representing new games owned by the user.
     """
     existing_appids = load_existing_appids(steamid)
-    owned_games = get_owned_games(steamid)
+    if owned_games is None:
+        owned_games = get_owned_games(steamid)
     new_games = [game for game in owned_games if game['appid'] not in existing_appids]
     return new_games
 
 
-def scrape_and_save_data(steamid, new_games):
+def prioritize_games(new_games, steam_hltb_data):
+    """
+    Yield games that already have an entry in `steam_hltb_map.json` first, followed
+    by the uncached games, which need the slow HLTB search.
+
+    Args:
+        new_games (list): List of dictionaries representing new games owned by the user.
+        steam_hltb_data (dict): Existing mapping data for AppIDs to HLTB data, as
+                                GameRecord objects.
+
+    Yields:
+        dict: Dictionary representing a game owned by the user.
+    """
+    uncached_games = []
+    for game in new_games:
+        if steam_hltb_data.get(game['appid']) is not None:
+            yield game
+        else:
+            uncached_games.append(game)
+    yield from uncached_games
+
+
+def scrape_games(steamid, games, progress_bar, steam_hltb_data):
+    """
+    Scrape data for each game as it is pulled from `games`, skipping games that
+    fail to scrape.
+
+    Args:
+        steamid (str): The SteamID of the user.
+        games (iterable): Iterable of dictionaries representing games owned by the user.
+        progress_bar (tqdm.tqdm): Progress bar for tracking progress.
+        steam_hltb_data (dict): Existing mapping data for AppIDs to HLTB data, as
+                                GameRecord objects.
+
+    Yields:
+        tuple: A tuple containing a list of scraped data and a list of AppIDs with
+               no achievements for a single game.
+    """
+    for game in games:
+        try:
+            yield scrape_steam_data(steamid, game, progress_bar, steam_hltb_data)
+        except Exception as error:
+            game_info = f"AppID: {game.get('appid')}, Title: {game.get('name')}"
+            print(f"\nError scraping data for {game_info}: {error}")
+
+
+def scrape_and_save_data(steamid, new_games, stream=False):
     """
     Scrape data for new games from Steam and HowLongToBeat, save the scraped data
     to a JSON file associated with the SteamID, and update 'data/no_achievements.json'
     with AppIDs of games that have no achievements.
 
+    The user's JSON file is kept sorted by rarest achievement and rewritten after
+    every game, so it can be read while the scan is still running.
+
     Args:
         steamid (str): The SteamID of the user.
         new_games (list): List of dictionaries representing new games owned by the user.
+        stream (bool): If True, scrape games with cached map data first so the most
+                       useful rows arrive early.
     """
     steam_hltb_data = load_existing_ids()
     progress_bar = tqdm(total=len(new_games), unit='games', ncols=100)
-    for game in new_games:
+    games = prioritize_games(new_games, steam_hltb_data) if stream else new_games
+    for scraped_data, no_achievements in scrape_games(
+            steamid, games, progress_bar, steam_hltb_data):
         try:
-            scraped_data, no_achievements = scrape_steam_data(
-                steamid, game, progress_bar, steam_hltb_data)
             save_to_json(scraped_data, steamid)
             save_appids_without_achievements(no_achievements)
         except Exception as error:
-            game_info = f"AppID: {game.get('appid')}, Title: {game.get('name')}"
-            print(f"\nError scraping data for {game_info}: {error}")
-            continue
+            print(f"\nError saving scraped data: {error}")
     progress_bar.close()
 
+def handle_resolve_vanities(path):
+    """
+    Resolve the vanity URLs listed in a file (one per line) to SteamIDs, caching
+    the results, and print each vanity URL with its SteamID.
+
+    Args:
+        path (str): The path of the file listing the vanity URLs.
+    """
+    with open(path, 'r', encoding='utf-8') as vanity_file:
+        vanities = [line.strip() for line in vanity_file if line.strip()]
+
+    for vanity, steamid in resolve_vanity_urls(vanities).items():
+        print(f"{vanity}: {steamid or 'not found'}")
+
+
+def handle_top(steamid, view, limit):
+    """
+    Print the top games of a user's ranked view, read from its index file.
+
+    Args:
+        steamid (str): The SteamID of the user.
+        view (str): The name of the view ('rarity', 'hltb' or 'uncompleted').
+        limit (int): The maximum number of games to print.
+    """
+    rows = get_top_games(steamid, view, limit)
+    if not rows:
+        print(f"No games found in the '{view}' view for {steamid}.")
+        return
+
+    for rank, (appid, title, value) in enumerate(rows, start=1):
+        print(f"{rank:>4}. {title} (AppID: {appid}): {value}")
+
+
+def handle_schedule(budget, tick):
+    """
+    Keep all tracked users up to date until interrupted. On each tick, users whose
+    next check is due are scanned incrementally in order of their next-check time
+    until the request budget for the tick is spent. Users with new games left over,
+    and users whose check failed, are due again on the next tick. Users whose JSON
+    file was created since the last tick are added to the queue.
+
+    Args:
+        budget (int): The Steam API request budget per tick.
+        tick (int): The number of seconds between ticks.
+    """
+    schedule = load_schedule()
+    queue = build_queue(schedule, list_tracked_steamids())
+
+    while True:
+        add_new_users(queue, schedule, list_tracked_steamids())
+        now = time.time()
+        remaining = budget
+        while queue and queue[0][0] <= now and remaining > 0:
+            _, steamid = heapq.heappop(queue)
+            try:
+                remaining -= 1
+                owned_games = get_owned_games(steamid)
+                new_games = get_new_games(steamid, owned_games)
+            except Exception as error:
+                print(f"\nError checking {steamid}: {error}")
+                heapq.heappush(queue, (retry_user(schedule, steamid, now + tick), steamid))
+                save_schedule(schedule)
+                continue
+
+            scanned_games = new_games[:max(0, remaining) // REQUESTS_PER_GAME]
+            if scanned_games:
+                print(f"Scanning {len(scanned_games)} new game(s) for {steamid}.")
+                remaining -= len(scanned_games) * REQUESTS_PER_GAME
+                try:
+                    scrape_and_save_data(steamid, scanned_games)
+                except Exception as error:
+                    print(f"\nError scanning {steamid}: {error}")
+
+            next_check = reschedule_user(schedule, steamid, owned_games, new_games,
+                                         scanned_games, now)
+            if len(scanned_games) < len(new_games):
+                next_check = schedule[steamid]['next_check'] = now + tick
+            heapq.heappush(queue, (next_check, steamid))
+            save_schedule(schedule)
+
+        time.sleep(tick)
+
+
 def main():
     """
     Main entry point for the Steam Completionist project.
@@ -165,6 +353,11 @@ def main():
     - If `-u` or `--update-no-achievements` is provided, updates the no_achievements.json file.
     - If `-m` or `--map-update` is provided, updates the steam_hltb_map.json file.
     - If '--sort' is provided, sorts the steam_hltb_map.json file.
+    - If '--stream' is provided, games with cached map data are scraped first.
+    - If '--schedule' is provided, keeps all tracked users up to date.
+    - If '--top' is provided, shows the top games of a ranked view for the user.
+    - If '--compress' is provided, converts all data files to the given compression.
+    - If '--resolve-vanities' is provided, resolves and caches the listed vanity URLs.
     - Otherwise, scrapes the Steam user's library for new games, retrieves achievement data,
       and manages the no-achievement game list.
     """
@@ -201,14 +394,38 @@ def main():
         update_hltb_completionist_times()
         sys.exit()
 
-    steamid = resolve_steamid(args)
+    if args.compress:
+        migrate_data_files(None if args.compress == 'none' else args.compress)
+        sys.exit()
+
+    if args.resolve_vanities:
+        handle_resolve_vanities(args.resolve_vanities)
+        sys.exit()
+
+    if args.schedule:
+        try:
+            handle_schedule(args.budget, args.tick)
+        except KeyboardInterrupt:
+            print("\nScheduler stopped.")
+        sys.exit()
+
+    try:
+        steamid = resolve_steamid(args)
+    except ValueError as error:
+        print(f"Error: {error}")
+        sys.exit(1)
+
+    if args.top:
+        handle_top(steamid, args.top, args.limit)
+        sys.exit()
+
     new_games = get_new_games(steamid)
 
     if not new_games:
         print("No new games found to update.")
         sys.exit()
 
-    scrape_and_save_data(steamid, new_games)
+    scrape_and_save_data(steamid, new_games, stream=args.stream)
 
 if __name__ == "__main__":
     main()
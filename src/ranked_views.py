@@ -0,0 +1,184 @@
+# ranked_views.py
+"""
+Maintained ranked views of a user's games in the Steam Completionist project.
+
+Each view is a small index file in `data/index` that holds one row per game,
+[AppID, Title, value], kept in ranked order. New games are placed with a binary
+search as they are saved, so the user's JSON file never has to be re-sorted to
+answer a top-N query, and the query reads only the index file. A missing index
+file is built once from the user's JSON file.
+
+Every index file also records the path, mtime and size of the user's JSON file
+it matches. If a save was interrupted after writing the user's JSON file but
+before its index files, the recorded state no longer matches and the view is
+rebuilt from the user's JSON file. Only the binary search is O(log n): each save
+still reads and rewrites the whole JSON file and every index file.
+
+Views:
+    - rarity: All games by rarest achievement %, highest first.
+    - hltb: Games with a known HLTB completionist time, shortest first.
+    - uncompleted: Games not yet completed by the user, by rarest achievement %,
+      highest first.
+
+Functions:
+    - get_user_file_state(steamid): Get the path, mtime and size of a user's JSON file.
+    - update_ranked_views(steamid, records, all_records, previous_state): Insert new games
+      into every view.
+    - build_ranked_view(steamid, view, records): Build and save a view from all of a
+      user's games.
+    - get_top_games(steamid, view, limit): Read the top rows of a view.
+
+Example Usage:
+    # Show the ten shortest games to complete for a user
+    get_top_games('76561197960287930', 'hltb', 10)
+"""
+
+import os
+from bisect import bisect_right
+from game_record import GameRecord
+from storage import data_file_exists, find_data_file, read_json, write_json
+
+DATA_DIR = 'data'
+INDEX_DIR = os.path.join(DATA_DIR, 'index')
+
+# view name -> (row value getter, row filter, sort key for rows)
+VIEWS = {
+    'rarity': (
+        lambda record: record.rarest_achievement,
+        lambda record: record.rarest_achievement is not None,
+        lambda row: -float(row[2])
+    ),
+    'hltb': (
+        lambda record: record.hltb_completionist_time,
+        lambda record: record.hltb_completionist_time is not None,
+        lambda row: float(row[2])
+    ),
+    'uncompleted': (
+        lambda record: record.rarest_achievement,
+        lambda record: record.completed is not True and record.rarest_achievement is not None,
+        lambda row: -float(row[2])
+    )
+}
+
+def get_view_path(steamid, view):
+    """
+    Get the path of a user's index file for a view.
+
+    Args:
+        steamid (str): The SteamID of the user.
+        view (str): The name of the view.
+
+    Returns:
+        str: The path of the index file.
+    """
+    return os.path.join(INDEX_DIR, f"{view}_{steamid}.json")
+
+
+def get_user_file_state(steamid):
+    """
+    Get the path, modification time and size of a user's stored JSON file.
+
+    Args:
+        steamid (str): The SteamID of the user.
+
+    Returns:
+        dict or None: A dictionary with 'path', 'mtime' and 'size', or None if the
+                      user has no JSON file.
+    """
+    user_json_file = find_data_file(os.path.join(DATA_DIR, f"{steamid}.json"))
+    if user_json_file is None:
+        return None
+
+    stat = os.stat(user_json_file)
+    return {'path': user_json_file, 'mtime': stat.st_mtime_ns, 'size': stat.st_size}
+
+
+def update_ranked_views(steamid, records, all_records, previous_state):
+    """
+    Insert newly saved games into every ranked view of a user. A view without an
+    index file yet, or whose index file doesn't match the user's JSON file as it
+    was before the new games were saved, is built from all of the user's games
+    instead.
+
+    Args:
+        steamid (str): The SteamID of the user.
+        records (list): List of newly saved GameRecord objects.
+        all_records (list): List of all of the user's GameRecord objects, including
+                            the new ones.
+        previous_state (dict or None): The state of the user's JSON file before the
+                                       new games were saved, as returned by
+                                       `get_user_file_state()`.
+    """
+    user_file_state = get_user_file_state(steamid)
+
+    for view, (get_value, include, sort_key) in VIEWS.items():
+        view_path = get_view_path(steamid, view)
+        index = read_json(view_path) if data_file_exists(view_path) else None
+
+        if not isinstance(index, dict) or index.get('user_file') != previous_state:
+            build_ranked_view(steamid, view, all_records)
+            continue
+
+        rows = index['rows']
+        row_keys = [sort_key(row) for row in rows]
+        for record in records:
+            if include(record):
+                row = [record.appid, record.title, get_value(record)]
+                position = bisect_right(row_keys, sort_key(row))
+                row_keys.insert(position, sort_key(row))
+                rows.insert(position, row)
+
+        write_json(view_path, {'user_file': user_file_state, 'rows': rows})
+
+
+def build_ranked_view(steamid, view, records):
+    """
+    Build a user's ranked view from all of their games and save its index file,
+    recording the current state of the user's JSON file.
+
+    Args:
+        steamid (str): The SteamID of the user.
+        view (str): The name of the view.
+        records (list): List of all of the user's GameRecord objects.
+
+    Returns:
+        list: List of [AppID, Title, value] rows in ranked order.
+    """
+    get_value, include, sort_key = VIEWS[view]
+    rows = [[record.appid, record.title, get_value(record)]
+            for record in records if include(record)]
+    rows.sort(key=sort_key)
+
+    os.makedirs(INDEX_DIR, exist_ok=True)
+    write_json(get_view_path(steamid, view),
+               {'user_file': get_user_file_state(steamid), 'rows': rows})
+    return rows
+
+
+def get_top_games(steamid, view, limit):
+    """
+    Read the top rows of a user's ranked view. If the view has no index file yet,
+    or its index file doesn't match the user's JSON file, it is built from the
+    user's JSON file first.
+
+    Args:
+        steamid (str): The SteamID of the user.
+        view (str): The name of the view ('rarity', 'hltb' or 'uncompleted').
+        limit (int): The maximum number of rows to return.
+
+    Returns:
+        list: List of [AppID, Title, value] rows in ranked order. Empty if the
+              user has no JSON file.
+    """
+    user_file_state = get_user_file_state(steamid)
+    if user_file_state is None:
+        return []
+
+    view_path = get_view_path(steamid, view)
+    if data_file_exists(view_path):
+        index = read_json(view_path)
+        if isinstance(index, dict) and index.get('user_file') == user_file_state:
+            return index['rows'][:limit]
+
+    records = [GameRecord.from_dict(entry) for entry in read_json(user_file_state['path'])]
+    return build_ranked_view(steamid, view, records)[:limit]
@@ -0,0 +1,182 @@
+# scheduler.py
+"""
+Adaptive polling schedule for keeping many tracked Steam users up to date.
+
+Each tracked user gets a next-check time derived from their observed activity.
+Users who play often or keep adding games are checked more often, inactive users
+back off towards a weekly check, so the Steam API request budget is spent on
+active users. The schedule is kept in `data/schedule.json`.
+
+Functions:
+    - load_schedule(): Load the schedule of tracked users.
+    - save_schedule(schedule): Save the schedule of tracked users.
+    - list_tracked_steamids(): List the SteamIDs with a user JSON file in the data directory.
+    - build_queue(schedule, steamids): Build a priority queue of users ordered by next check.
+    - add_new_users(queue, schedule, steamids): Add users that aren't in the queue yet.
+    - reschedule_user(schedule, steamid, owned_games, new_games, scanned_games, now):
+      Compute and store a user's next-check time from their activity.
+    - retry_user(schedule, steamid, retry_at): Retry a failed check without changing the
+      user's activity data.
+
+Example Usage:
+    schedule = load_schedule()
+    queue = build_queue(schedule, list_tracked_steamids())
+"""
+
+import os
+import json
+import heapq
+from user_files import list_user_json_files
+from storage import data_file_exists, read_json, write_json
+
+DATA_DIR = 'data'
+SCHEDULE_FILE = os.path.join(DATA_DIR, 'schedule.json')
+
+MIN_INTERVAL = 60 * 60
+DEFAULT_INTERVAL = 24 * 60 * 60
+MAX_INTERVAL = 7 * 24 * 60 * 60
+
+# A scraped game costs one global achievement and one player achievement request.
+REQUESTS_PER_GAME = 2
+
+def load_schedule():
+    """
+    Load the schedule of tracked users from `schedule.json`.
+
+    Returns:
+        dict: A dictionary with SteamIDs as keys and dictionaries with 'next_check',
+              'interval' and 'last_played' (Unix timestamps / seconds) and 'pending'
+              (AppIDs of new games not scanned yet) as values.
+    """
+    if not data_file_exists(SCHEDULE_FILE):
+        return {}
+
+    try:
+        return read_json(SCHEDULE_FILE)
+    except json.JSONDecodeError:
+        return {}
+
+
+def save_schedule(schedule):
+    """
+    Save the schedule of tracked users to `schedule.json`.
+
+    Args:
+        schedule (dict): The schedule as returned by `load_schedule()`.
+    """
+    write_json(SCHEDULE_FILE, schedule)
+
+
+def list_tracked_steamids():
+    """
+    List the SteamIDs that have a user JSON file in the data directory.
+
+    Returns:
+        list: List of SteamIDs (str).
+    """
+    steamids = []
+    for json_file in list_user_json_files():
+        steamid = os.path.basename(json_file).split('.')[0]
+        if steamid.isdigit() and len(steamid) == 17:
+            steamids.append(steamid)
+    return steamids
+
+
+def build_queue(schedule, steamids):
+    """
+    Build a priority queue of users ordered by their next-check time. Users without
+    a schedule entry are due immediately.
+
+    Args:
+        schedule (dict): The schedule as returned by `load_schedule()`.
+        steamids (iterable): SteamIDs of the tracked users.
+
+    Returns:
+        list: A heap of (next_check, steamid) tuples.
+    """
+    queue = []
+    for steamid in set(steamids) | set(schedule):
+        queue.append((schedule.get(steamid, {}).get('next_check', 0), steamid))
+    heapq.heapify(queue)
+    return queue
+
+
+def add_new_users(queue, schedule, steamids):
+    """
+    Add tracked users that aren't in the priority queue yet, such as users whose
+    JSON file was created after the queue was built. Users without a schedule
+    entry are due immediately.
+
+    Args:
+        queue (list): A heap of (next_check, steamid) tuples as returned by `build_queue()`.
+        schedule (dict): The schedule as returned by `load_schedule()`.
+        steamids (iterable): SteamIDs of the tracked users.
+    """
+    queued_steamids = {steamid for _, steamid in queue}
+    for steamid in set(steamids) - queued_steamids:
+        heapq.heappush(queue, (schedule.get(steamid, {}).get('next_check', 0), steamid))
+
+
+def reschedule_user(schedule, steamid, owned_games, new_games, scanned_games, now):
+    """
+    Compute a user's next-check time from their activity and store it in the schedule.
+
+    The check interval is halved when the user has played since the last check
+    (`rtime_last_played` moved forward) or new games showed up, and doubled
+    otherwise, staying between one hour and one week. New games left unscanned
+    by an earlier, budget-capped check are not counted as new again, and the
+    interval is kept as it is while such a backlog is being scanned, so a user
+    with many new games doesn't back off just for the ticks it takes to scan them.
+
+    Args:
+        schedule (dict): The schedule as returned by `load_schedule()`.
+        steamid (str): The SteamID of the user.
+        owned_games (list): The user's owned games as returned by `get_owned_games()`.
+        new_games (list): The user's new games as returned by `get_new_games()`.
+        scanned_games (list): The new games that were scanned in this check.
+        now (float): The current Unix timestamp.
+
+    Returns:
+        float: The Unix timestamp of the user's next check.
+    """
+    entry = schedule.get(steamid, {})
+    interval = entry.get('interval', DEFAULT_INTERVAL)
+    previous_last_played = entry.get('last_played', 0)
+    last_played = max([previous_last_played] +
+                      [game.get('rtime_last_played', 0) for game in owned_games])
+
+    pending_appids = set(entry.get('pending', []))
+    new_appids = {game['appid'] for game in new_games}
+    unseen_appids = new_appids - pending_appids
+    scanned_appids = {game['appid'] for game in scanned_games}
+
+    if unseen_appids or last_played > previous_last_played:
+        interval = max(MIN_INTERVAL, interval // 2)
+    elif not pending_appids:
+        interval = min(MAX_INTERVAL, interval * 2)
+
+    next_check = now + interval
+    schedule[steamid] = {
+        'next_check': next_check,
+        'interval': interval,
+        'last_played': last_played,
+        'pending': sorted(new_appids - scanned_appids)
+    }
+    return next_check
+
+
+def retry_user(schedule, steamid, retry_at):
+    """
+    Schedule another check for a user whose check failed, keeping their stored
+    interval, last played time and pending games.
+
+    Args:
+        schedule (dict): The schedule as returned by `load_schedule()`.
+        steamid (str): The SteamID of the user.
+        retry_at (float): The Unix timestamp of the next attempt.
+
+    Returns:
+        float: The Unix timestamp of the user's next check.
+    """
+    schedule.setdefault(steamid, {})['next_check'] = retry_at
+    return retry_at
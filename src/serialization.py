@@ -0,0 +1,62 @@
+# serialization.py
+"""
+JSON serialization for the Steam Completionist project.
+
+All data files are encoded and decoded here. The fast `orjson` library is used
+when it is installed, otherwise the standard library `json` module. Files can be
+written in a compact mode (no whitespace) for files only read by the script, or
+a pretty mode (indented by two spaces) for files meant to be read or edited by
+hand. Both modes write non-ASCII characters as raw UTF-8, and both libraries
+produce the same layout, so files look the same whether or not orjson is installed.
+
+Functions:
+    - loads(data): Decode JSON from bytes or a string.
+    - dumps(data, pretty): Encode data as UTF-8 JSON bytes.
+
+Dependencies:
+    - orjson: Optional library for fast JSON encoding and decoding.
+    - json: Fallback module for encoding and decoding.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def loads(data):
+    """
+    Decode JSON from bytes or a string.
+
+    Args:
+        data (bytes or str): The JSON document.
+
+    Returns:
+        The decoded data.
+
+    Raises:
+        json.JSONDecodeError: If the data isn't valid JSON (orjson's error is a subclass).
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(data, pretty=False):
+    """
+    Encode data as UTF-8 JSON bytes.
+
+    Args:
+        data: The data to be encoded.
+        pretty (bool): If True, indent the output by two spaces for human readers.
+                       Otherwise the output is compact.
+
+    Returns:
+        bytes: The encoded JSON document.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
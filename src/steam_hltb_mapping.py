@@ -4,14 +4,23 @@ This module manages a JSON file (`steam_hltb_map.json`) that maps Steam AppIDs t
 for games. It provides functionality to scan user JSON files containing game data, extract
 relevant information, and update the `steam_hltb_map.json` file with new entries.
 
+Several processes may update `steam_hltb_map.json` at the same time. Every write
+locks the file, re-reads it and merges its own changes into the current content.
+
 Functions:
-    - add_new_ids_from_users(): Scan user JSON files and add new Steam IDs to the mapping file.
+    - add_new_ids_from_users(): Scan changed user JSON files and add new Steam IDs to the
+      mapping file.
+    - get_steam_hltb_map_state(): Get the path, mtime and size of `steam_hltb_map.json`.
+    - load_user_files_manifest(): Load the manifest of already merged user JSON files.
+    - save_user_files_manifest(merged_files): Save the manifest of merged user JSON files.
+    - get_user_files_state(): Get the mtime and size of every user JSON file.
     - load_existing_ids(): Load existing Steam AppIDs from `steam_hltb_map.json`.
     - update_steam_hltb_map(new_entries): Update `steam_hltb_map.json` with new entries.
-    - list_user_json_files(): List all user JSON files in the data directory.
     - sort_steam_hltb_map(): Sort the `steam_hltb_map.json` file by AppID.
     - update_rarest_achievement_percentages(): Update the Rarest Achievement % for each game.
     - update_hltb_completionist_times(): Update HLTB completionist times for all entries.
+    - merge_steam_hltb_map_updates(updates, attribute): Write updated values of one field into
+      `steam_hltb_map.json`.
 
 Example Usage:
     # Add new Steam IDs from user JSON files to the mapping file
@@ -19,131 +28,196 @@ Example Usage:
 """
 import os
 import json
+from concurrent.futures import ProcessPoolExecutor
 from tqdm import tqdm
 from steam_utils import get_game_achievement_data, get_rarest_achievement_percentage
 from hltb_utils import get_time_by_id
+from game_record import GameRecord
+from user_files import read_user_entries, list_user_json_files
+from storage import data_file_exists, find_data_file, read_json, write_json, lock_data_file
 
 DATA_DIR = 'data'
 STEAM_HLTB_MAP_FILE = os.path.join(DATA_DIR, 'steam_hltb_map.json')
+USER_FILES_MANIFEST = os.path.join(DATA_DIR, 'user_files_manifest.json')
+
+# Parsing only a few changed files isn't worth starting worker processes.
+PROCESS_POOL_MIN_FILES = 4
 
 def add_new_ids_from_users():
     """
-    Scan all user JSON files in the data directory and add any new Steam IDs
-    found to the `steam_hltb_map.json` file.
+    Scan the user JSON files in the data directory that changed since the last
+    merge and add any new Steam IDs found to the `steam_hltb_map.json` file.
+
+    Unchanged files (same size and modification time as recorded in the manifest)
+    are skipped. The manifest is only trusted while `steam_hltb_map.json` is the
+    same file it was recorded against; otherwise every user file is read again.
+    When many files changed, they are parsed in parallel with a process pool.
     """
     existing_ids = load_existing_ids()
+    merged_files = load_user_files_manifest()
 
     new_entries = {}
 
-    user_json_files = list_user_json_files()
-    for json_file in user_json_files:
-        with open(json_file, 'r', encoding='utf-8') as jsonfile:
-            user_data = json.load(jsonfile)
-            for entry in user_data:
-                app_id = entry.get('AppID')
-                title = entry.get('Title')
-                rarest_achievement = entry.get('Rarest Achievement %')
-                hltb_id = entry.get('HLTB ID')
-                hltb_title = entry.get('HLTB Title')
-                hltb_completionist_time = entry.get('HLTB Completionist Time')
-
-                if app_id not in existing_ids and app_id not in new_entries:
-                    new_entries[app_id] = {
-                        'AppID': app_id,
-                        'Title': title,
-                        'Rarest Achievement %': rarest_achievement,
-                        'HLTB ID': hltb_id,
-                        'HLTB Title': hltb_title,
-                        'HLTB Completionist Time': hltb_completionist_time
-                    }
+    user_files = get_user_files_state()
+    changed_files = [json_file for json_file, state in user_files.items()
+                     if merged_files.get(json_file) != state]
+
+    if len(changed_files) > PROCESS_POOL_MIN_FILES:
+        with ProcessPoolExecutor() as executor:
+            all_user_entries = list(executor.map(read_user_entries, changed_files))
+    else:
+        all_user_entries = [read_user_entries(json_file) for json_file in changed_files]
+
+    for user_entries in all_user_entries:
+        for record in user_entries:
+            app_id = record.appid
+            if app_id not in existing_ids and app_id not in new_entries:
+                new_entries[app_id] = record
 
     if new_entries:
         update_steam_hltb_map(list(new_entries.values()))
     else:
         print("No new entries added.")
 
+    save_user_files_manifest(user_files)
+
+
+def get_steam_hltb_map_state():
+    """
+    Get the path, modification time and size of the stored `steam_hltb_map.json`.
+
+    Returns:
+        dict or None: A dictionary with 'path', 'mtime' and 'size', or None if the
+                      map doesn't exist.
+    """
+    map_path = find_data_file(STEAM_HLTB_MAP_FILE)
+    if map_path is None:
+        return None
+
+    stat = os.stat(map_path)
+    return {'path': map_path, 'mtime': stat.st_mtime_ns, 'size': stat.st_size}
+
+
+def load_user_files_manifest():
+    """
+    Load the manifest of user JSON files already merged into `steam_hltb_map.json`.
+
+    Returns:
+        dict: A dictionary mapping file paths to their recorded 'mtime' and 'size'.
+              Empty if there is no manifest or `steam_hltb_map.json` is missing or
+              has changed since the manifest was saved.
+    """
+    if not data_file_exists(USER_FILES_MANIFEST):
+        return {}
+
+    try:
+        manifest = read_json(USER_FILES_MANIFEST)
+    except json.JSONDecodeError:
+        return {}
+
+    map_state = get_steam_hltb_map_state()
+    if map_state is None or manifest.get('map') != map_state:
+        return {}
+    return manifest.get('files', {})
+
+
+def save_user_files_manifest(merged_files):
+    """
+    Save the manifest of user JSON files merged into `steam_hltb_map.json`,
+    recorded against the current state of the map.
+
+    Args:
+        merged_files (dict): A dictionary mapping the paths of all merged user JSON
+                             files to their 'mtime' and 'size'.
+    """
+    with lock_data_file(USER_FILES_MANIFEST):
+        write_json(USER_FILES_MANIFEST, {
+            'map': get_steam_hltb_map_state(),
+            'files': merged_files
+        })
+
+
+def get_user_files_state():
+    """
+    Get the modification time and size of every user JSON file in the data directory.
+
+    Returns:
+        dict: A dictionary mapping the paths of user JSON files to their current
+              'mtime' and 'size'.
+    """
+    user_files = {}
+    for json_file in list_user_json_files():
+        stat = os.stat(json_file)
+        user_files[json_file] = {'mtime': stat.st_mtime_ns, 'size': stat.st_size}
+    return user_files
+
 
 def load_existing_ids():
     """
     Load existing Steam IDs from `steam_hltb_map.json`.
 
     Returns:
-        dict: A dictionary of existing entries with AppIDs as keys.
+        dict: A dictionary of existing GameRecord objects with AppIDs as keys.
     """
-    if not os.path.exists(STEAM_HLTB_MAP_FILE):
-        with open(STEAM_HLTB_MAP_FILE, 'w', encoding='utf-8') as jsonfile:
-            json.dump([], jsonfile)
+    with lock_data_file(STEAM_HLTB_MAP_FILE):
+        if not data_file_exists(STEAM_HLTB_MAP_FILE):
+            write_json(STEAM_HLTB_MAP_FILE, [])
 
-    with open(STEAM_HLTB_MAP_FILE, 'r', encoding='utf-8') as jsonfile:
-        try:
-            existing_data = json.load(jsonfile)
-        except json.JSONDecodeError:
-            existing_data = []
+    try:
+        existing_data = read_json(STEAM_HLTB_MAP_FILE)
+    except json.JSONDecodeError:
+        existing_data = []
 
-    return {entry['AppID']: entry for entry in existing_data}
+    return {entry['AppID']: GameRecord.from_dict(entry) for entry in existing_data}
 
 
 def update_steam_hltb_map(new_entries):
     """
     Update `steam_hltb_map.json` with new entries (AppID, HLTB ID, Title,
-    Rarest Achievement %, HLTB Title, HLTB Completionist Time).
+    Rarest Achievement %, HLTB Title, HLTB Completionist Time). Entries added
+    by another process in the meantime are not added again.
 
     Args:
-        new_entries (list): List of dictionaries containing new entries to be added to the
-                            `steam_hltb_map.json` file. Each dictionary represents an entry
-                            with keys 'AppID', 'HLTB ID', 'Title', 'Rarest Achievement %',
-                            'HLTB Title', 'HLTB Completionist Time'.
+        new_entries (list): List of GameRecord objects to be added to the
+                            `steam_hltb_map.json` file.
     """
-    with open(STEAM_HLTB_MAP_FILE, 'r', encoding='utf-8') as jsonfile:
+    with lock_data_file(STEAM_HLTB_MAP_FILE):
         try:
-            existing_data = json.load(jsonfile)
+            existing_data = read_json(STEAM_HLTB_MAP_FILE)
         except json.JSONDecodeError:
             existing_data = []
 
-    existing_data.extend(new_entries)
+        existing_ids = {entry['AppID'] for entry in existing_data}
+        added_entries = [record.to_map_entry() for record in new_entries
+                         if record.appid not in existing_ids]
+        existing_data.extend(added_entries)
 
-    with open(STEAM_HLTB_MAP_FILE, 'w', encoding='utf-8') as jsonfile:
-        json.dump(existing_data, jsonfile, indent=4)
+        write_json(STEAM_HLTB_MAP_FILE, existing_data, pretty=True)
 
-    num_entries_added = len(new_entries)
+    num_entries_added = len(added_entries)
     entry_word = "entry" if num_entries_added == 1 else "entries"
     print(f"Added {num_entries_added} new {entry_word} to steam_hltb_map.json.")
 
 
-def list_user_json_files():
-    """
-    List all user JSON files in the data directory.
-
-    Returns:
-        list: List of file paths to user JSON files in the data directory.
-    """
-    user_json_files = []
-    for root, _dirs, files in os.walk(DATA_DIR):
-        for file in files:
-            if file.startswith("7"):
-                user_json_files.append(os.path.join(root, file))
-    return user_json_files
-
-
 def sort_steam_hltb_map():
     """
     Sort the `steam_hltb_map.json` file by AppID.
     """
-    if not os.path.exists(STEAM_HLTB_MAP_FILE):
+    if not data_file_exists(STEAM_HLTB_MAP_FILE):
         print("steam_hltb_map.json does not exist.")
         return
 
-    with open(STEAM_HLTB_MAP_FILE, 'r', encoding='utf-8') as jsonfile:
+    with lock_data_file(STEAM_HLTB_MAP_FILE):
         try:
-            data = json.load(jsonfile)
+            data = [GameRecord.from_dict(entry) for entry in read_json(STEAM_HLTB_MAP_FILE)]
         except json.JSONDecodeError:
             print("steam_hltb_map.json is empty or corrupted.")
             return
 
-    sorted_data = sorted(data, key=lambda x: x['AppID'])
+        sorted_data = sorted(data, key=lambda x: x.appid)
 
-    with open(STEAM_HLTB_MAP_FILE, 'w', encoding='utf-8') as jsonfile:
-        json.dump(sorted_data, jsonfile, indent=4)
+        write_json(STEAM_HLTB_MAP_FILE, [record.to_map_entry() for record in sorted_data],
+                   pretty=True)
 
     print("steam_hltb_map.json has been sorted.")
 
@@ -153,29 +227,28 @@ def update_rarest_achievement_percentages():
     Update the Rarest Achievement % for each game in `steam_hltb_map.json`
     with a progress bar.
     """
-    with open(STEAM_HLTB_MAP_FILE, 'r', encoding='utf-8') as jsonfile:
-        try:
-            data = json.load(jsonfile)
-        except json.JSONDecodeError:
-            print("steam_hltb_map.json is empty or corrupted.")
-            return
+    try:
+        data = [GameRecord.from_dict(entry) for entry in read_json(STEAM_HLTB_MAP_FILE)]
+    except json.JSONDecodeError:
+        print("steam_hltb_map.json is empty or corrupted.")
+        return
 
     num_entries = len(data)
     progress_bar = tqdm(total=num_entries, desc="Updating Rarest Achievements",
                         unit="game", ncols=100)
 
-    for entry in data:
-        appid = entry.get('AppID')
+    updates = {}
+    for record in data:
+        appid = record.appid
         if appid:
             achievements = get_game_achievement_data(appid)
             if achievements:
-                entry['Rarest Achievement %'] = get_rarest_achievement_percentage(achievements)
+                updates[appid] = get_rarest_achievement_percentage(achievements)
         progress_bar.update(1)
 
     progress_bar.close()
 
-    with open(STEAM_HLTB_MAP_FILE, 'w', encoding='utf-8') as jsonfile:
-        json.dump(data, jsonfile, indent=4)
+    merge_steam_hltb_map_updates(updates, 'rarest_achievement')
 
     print("Updated Rarest Achievement % for all games in steam_hltb_map.json.")
 
@@ -188,8 +261,8 @@ def update_hltb_completionist_times():
     the completionist time from HLTB using the HLTB ID, and updates the entry with the new time.
     """
     try:
-        with open('data/steam_hltb_map.json', 'r', encoding='utf-8') as file:
-            steam_hltb_map = json.load(file)
+        steam_hltb_map = [GameRecord.from_dict(entry)
+                          for entry in read_json(STEAM_HLTB_MAP_FILE)]
     except FileNotFoundError:
         print("Error: steam_hltb_map.json file not found.")
         return
@@ -200,19 +273,38 @@ def update_hltb_completionist_times():
     progress_bar = tqdm(total=len(steam_hltb_map), unit='games', ncols=100,
                         desc="Updating HLTB Completionist Times")
 
-    for entry in steam_hltb_map:
-        hltb_id = entry.get('HLTB ID')
+    updates = {}
+    for record in steam_hltb_map:
+        hltb_id = record.hltb_id
         if hltb_id:
             try:
                 completionist_time = get_time_by_id(hltb_id)
-                entry['HLTB Completionist Time'] = completionist_time
+                updates[record.appid] = completionist_time
             except Exception as error:
                 print(f"Error processing HLTB ID {hltb_id} for game "
-                f"{entry.get('Game Name')}: {error}")
+                f"{record.title}: {error}")
 
         progress_bar.update(1)
 
     progress_bar.close()
 
-    with open('data/steam_hltb_map.json', 'w', encoding='utf-8') as file:
-        json.dump(steam_hltb_map, file, indent=4, ensure_ascii=False)
+    merge_steam_hltb_map_updates(updates, 'hltb_completionist_time')
+
+
+def merge_steam_hltb_map_updates(updates, attribute):
+    """
+    Write updated values of one field into `steam_hltb_map.json`. The file is
+    locked and re-read first, so entries added or changed by other processes
+    while the updates were being fetched are kept.
+
+    Args:
+        updates (dict): A dictionary mapping AppIDs to the field's new value.
+        attribute (str): The GameRecord attribute of the field, e.g. 'rarest_achievement'.
+    """
+    with lock_data_file(STEAM_HLTB_MAP_FILE):
+        data = [GameRecord.from_dict(entry) for entry in read_json(STEAM_HLTB_MAP_FILE)]
+        for record in data:
+            if record.appid in updates:
+                setattr(record, attribute, updates[record.appid])
+
+        write_json(STEAM_HLTB_MAP_FILE, [record.to_map_entry() for record in data], pretty=True)
@@ -4,6 +4,8 @@ Utility functions to interact with the Steam API for the Steam Completionist pro
 
 This module provides functions to retrieve owned games, scrape achievement data,
 check completion status, resolve vanity URLs, and handle Steam API interactions.
+The Steam Web API client is created on the first request, so importing this
+module (for example in a spawned worker process) makes no network requests.
 
 Functions:
     - get_owned_games(steamid): Retrieve the list of games owned by a Steam user.
@@ -12,22 +14,41 @@ Functions:
     - player_has_completed(steamid, appid): Check if a user has completed all achievements.
     - scrape_steam_data(steamid, game, progress_bar, existing_data): Scrape data for a single game.
     - resolve_vanity_url(vanity): Resolve a Steam vanity URL to a SteamID.
+    - resolve_vanity_urls(vanities): Resolve a list of Steam vanity URLs to SteamIDs.
 
 Dependencies:
     - requests: Library for making HTTP requests.
     - steam.webapi: Library for accessing the Steam Web API.
-    - steam.steamid: Library for handling Steam IDs.
+    - storage: Reading and writing of data files, used for the vanity URL cache.
     - config.py: Configuration file for API keys and IDs.
 """
 
-import sys
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
 from steam.webapi import WebAPI
-from steam import steamid as sid
 from hltb_utils import get_hltb_data
+from game_record import GameRecord
+from storage import data_file_exists, read_json, write_json, lock_data_file
 from config import API_KEY
 
-api = WebAPI(key=API_KEY)
+DATA_DIR = 'data'
+VANITY_CACHE_FILE = os.path.join(DATA_DIR, 'vanity_cache.json')
+
+# Creating the client fetches the Steam Web API interface list, so it is only
+# done on first use rather than whenever the module is imported.
+_api = None
+_api_lock = threading.Lock()
+
+def _get_api():
+    global _api  # pylint: disable=global-statement
+    with _api_lock:
+        if _api is None:
+            _api = WebAPI(key=API_KEY)
+        return _api
+
 
 def get_owned_games(steamid):
     """
@@ -39,12 +60,12 @@ def get_owned_games(steamid):
     Returns:
         list: A list of dictionaries containing game information.
     """
-    owned_games = api.IPlayerService.GetOwnedGames(steamid=steamid, include_appinfo=True,
-                                                   include_played_free_games=True,
-                                                   appids_filter=False,
-                                                   include_free_sub=False,
-                                                   language='en',
-                                                   include_extended_appinfo=False)
+    owned_games = _get_api().IPlayerService.GetOwnedGames(steamid=steamid, include_appinfo=True,
+                                                          include_played_free_games=True,
+                                                          appids_filter=False,
+                                                          include_free_sub=False,
+                                                          language='en',
+                                                          include_extended_appinfo=False)
     return owned_games['response']['games']
 
 
@@ -60,7 +81,7 @@ def get_game_achievement_data(appid):
                       or None if there are no achievements.
     """
     try:
-        achievement_data = api.ISteamUserStats.GetGlobalAchievementPercentagesForApp(
+        achievement_data = _get_api().ISteamUserStats.GetGlobalAchievementPercentagesForApp(
             gameid=appid)['achievementpercentages']['achievements']
         if achievement_data == []:
             return None
@@ -98,7 +119,7 @@ def player_has_completed(steamid, appid):
                       or None if there's an issue retrieving the data.
     """
     try:
-        player_data = api.ISteamUserStats.GetPlayerAchievements(
+        player_data = _get_api().ISteamUserStats.GetPlayerAchievements(
             steamid=steamid, appid=appid)
     except requests.exceptions.HTTPError as _e:
         return None
@@ -117,10 +138,12 @@ def scrape_steam_data(steamid, game, progress_bar, existing_data):
         steamid (str): The SteamID of the user.
         game (dict): Dictionary containing game data.
         progress_bar (object): A progress bar object to update.
-        existing_data (dict): Existing mapping data for AppIDs to HLTB data.
+        existing_data (dict): Existing mapping data for AppIDs to HLTB data, as
+                              GameRecord objects.
 
     Returns:
-        tuple: A tuple containing a list of scraped data and a list of AppIDs with no achievements.
+        tuple: A tuple containing a list of scraped GameRecord objects and a list of
+               AppIDs with no achievements.
     """
     scraped_data, no_achievements = [], []
 
@@ -131,13 +154,13 @@ def scrape_steam_data(steamid, game, progress_bar, existing_data):
         progress_bar.update(1)
         return scraped_data, no_achievements
 
-    hltb_data = existing_data.get(appid, {})
-    if not hltb_data:
+    hltb_data = existing_data.get(appid)
+    if hltb_data is None:
         hltb_id, hltb_title, hltb_completionist_time = get_hltb_data(game_name)
     else:
-        hltb_id = hltb_data.get('HLTB ID')
-        hltb_title = hltb_data.get('HLTB Title')
-        hltb_completionist_time = hltb_data.get('HLTB Completionist Time')
+        hltb_id = hltb_data.hltb_id
+        hltb_title = hltb_data.hltb_title
+        hltb_completionist_time = hltb_data.hltb_completionist_time
 
     achievements = get_game_achievement_data(appid)
 
@@ -149,15 +172,15 @@ def scrape_steam_data(steamid, game, progress_bar, existing_data):
     rarest_achievement_percentage = get_rarest_achievement_percentage(achievements)
     has_completed = player_has_completed(steamid, appid)
 
-    scraped_data.append({
-        'AppID': appid,
-        'Title': game_name,
-        'Rarest Achievement %': rarest_achievement_percentage,
-        'Completed': has_completed,
-        'HLTB ID': hltb_id,
-        'HLTB Title': hltb_title,
-        'HLTB Completionist Time': hltb_completionist_time
-    })
+    scraped_data.append(GameRecord(
+        appid,
+        game_name,
+        rarest_achievement_percentage,
+        has_completed,
+        hltb_id,
+        hltb_title,
+        hltb_completionist_time
+    ))
 
     progress_bar.update(1)
 
@@ -172,16 +195,82 @@ def resolve_vanity_url(vanity):
         vanity (str): The custom vanity URL identifier from Steam.
 
     Returns:
-        str: The SteamID associated with the provided vanity URL.
+        str or None: The SteamID associated with the provided vanity URL, or None
+                     if it couldn't be resolved.
+    """
+    return resolve_vanity_urls([vanity]).get(vanity)
+
+
+def resolve_vanity_urls(vanities, max_workers=8):
+    """
+    Resolve a list of Steam vanity URLs to SteamIDs. Vanity URLs found in
+    `data/vanity_cache.json` are not looked up again. The rest are resolved
+    concurrently with `ISteamUser.ResolveVanityURL` and added to the cache.
+
+    Args:
+        vanities (list): List of custom vanity URL identifiers from Steam.
+        max_workers (int): The maximum number of concurrent API requests.
+
+    Returns:
+        dict: A dictionary mapping each vanity URL to its SteamID (str), or to None
+              if it couldn't be resolved.
+    """
+    cache = load_vanity_cache()
+    resolved = {vanity: cache.get(vanity.lower()) for vanity in vanities}
+
+    uncached = list({vanity.lower() for vanity, steamid in resolved.items() if steamid is None})
+    if not uncached:
+        return resolved
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        new_entries = {vanity: steamid for vanity, steamid
+                       in zip(uncached, executor.map(_resolve_vanity_with_api, uncached))
+                       if steamid is not None}
+
+    if new_entries:
+        save_vanity_cache(new_entries)
+
+    return {vanity: steamid or new_entries.get(vanity.lower())
+            for vanity, steamid in resolved.items()}
 
-    Raises:
-        ValueError: If resolution fails.
+
+def _resolve_vanity_with_api(vanity):
+    try:
+        response = _get_api().ISteamUser.ResolveVanityURL(
+            vanityurl=vanity, url_type=1)['response']
+        if response.get('success') != 1:
+            return None
+        return str(response['steamid'])
+    except Exception as error:
+        print(f"Error resolving vanity URL {vanity}: {error}")
+        return None
+
+
+def load_vanity_cache():
+    """
+    Load the cache of resolved vanity URLs from `vanity_cache.json`.
+
+    Returns:
+        dict: A dictionary mapping lowercase vanity URLs to SteamIDs (str).
     """
+    if not data_file_exists(VANITY_CACHE_FILE):
+        return {}
+
     try:
-        steam_id = str(sid.steam64_from_url(f'https://steamcommunity.com/id/{vanity}'))
-        if steam_id:
-            return steam_id
-        raise ValueError("Resolution of vanity URL failed.")
-    except Exception as _e:
-        print(f"Error resolving vanity URL: {_e}")
-        sys.exit(1)
+        return read_json(VANITY_CACHE_FILE)
+    except json.JSONDecodeError:
+        return {}
+
+
+def save_vanity_cache(new_entries):
+    """
+    Add resolved vanity URLs to `vanity_cache.json`, keeping the entries
+    added by other processes.
+
+    Args:
+        new_entries (dict): A dictionary mapping lowercase vanity URLs to SteamIDs (str).
+    """
+    with lock_data_file(VANITY_CACHE_FILE):
+        cache = load_vanity_cache()
+        cache.update(new_entries)
+        write_json(VANITY_CACHE_FILE, cache)
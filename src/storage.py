@@ -0,0 +1,268 @@
+# storage.py
+"""
+Reading and writing of JSON data files for the Steam Completionist project.
+
+Data files can be stored plain (`name.json`), gzip-compressed (`name.json.gz`) or
+zstd-compressed (`name.json.zst`, requires the optional `zstandard` package).
+Readers and writers take the plain path and detect whichever variant exists, so
+callers never need to know how a file is stored. New files use the compression
+set by `DATA_COMPRESSION` in `config.py` (None, 'gzip' or 'zstd'). Encoding and
+decoding is done by the `serialization` module.
+
+Writes go to a temporary file that replaces the data file when complete, so a
+reader never sees a half-written file. Every write, and every file converted by
+`migrate_data_files()`, holds an advisory lock from `lock_data_file(path)`, so a
+migration can't leave two variants of a file behind. Files shared between
+processes (such as `no_achievements.json`) are read, merged and written while
+holding the same lock, so several scans can run at the same time.
+
+Functions:
+    - find_data_file(path): Find the stored variant of a data file.
+    - data_file_exists(path): Check whether any variant of a data file exists.
+    - read_json(path): Load JSON data from a data file.
+    - write_json(path, data, pretty): Save JSON data to a data file.
+    - lock_data_file(path): Hold an exclusive advisory lock on a data file.
+    - migrate_data_files(compression): Convert all data files to a compression.
+
+Dependencies:
+    - gzip: Module for gzip compression.
+    - fcntl / msvcrt: Modules for file locking on Unix / Windows.
+    - serialization: JSON encoding and decoding.
+    - zstandard: Optional library for zstd compression.
+    - config.py: Configuration file for the default compression.
+"""
+
+import os
+import gzip
+import errno
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from serialization import loads, dumps
+
+try:
+    from config import DATA_COMPRESSION
+except ImportError:
+    DATA_COMPRESSION = None
+
+DATA_DIR = 'data'
+COMPRESSION_SUFFIXES = {'zstd': '.zst', 'gzip': '.gz'}
+
+# Lock files held by the current thread, so a locked read-modify-write can write.
+_held_locks = threading.local()
+
+# Data files already reported as stored in more than one variant.
+_duplicate_warnings = set()
+
+def _open(physical_path, mode):
+    if physical_path.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError(f"Reading {physical_path} requires the zstandard package.")
+        return zstandard.open(physical_path, mode)
+    if physical_path.endswith('.gz'):
+        return gzip.open(physical_path, mode)
+    return open(physical_path, mode)
+
+
+def _strip_suffix(path):
+    for suffix in COMPRESSION_SUFFIXES.values():
+        if path.endswith(suffix):
+            return path[:-len(suffix)]
+    return path
+
+
+def _resolve_compression(compression):
+    if compression == 'zstd' and zstandard is None:
+        print("zstandard is not installed, using gzip compression instead.")
+        return 'gzip'
+    return compression
+
+
+def find_data_file(path):
+    """
+    Find the stored variant of a data file. If more than one variant exists, the
+    compressed one is used and a warning is printed once.
+
+    Args:
+        path (str): The plain path of the data file (e.g. 'data/steam_hltb_map.json'),
+                    or the path of a specific variant.
+
+    Returns:
+        str or None: The path of the existing variant, or None if the file doesn't exist.
+    """
+    if path != _strip_suffix(path):
+        return path if os.path.isfile(path) else None
+
+    variants = [path + suffix for suffix in COMPRESSION_SUFFIXES.values()] + [path]
+    existing = [variant for variant in variants if os.path.isfile(variant)]
+    if len(existing) > 1 and path not in _duplicate_warnings:
+        _duplicate_warnings.add(path)
+        print(f"Warning: {path} is stored as {', '.join(existing)}. Using {existing[0]}, "
+              "remove the other copies.")
+    return existing[0] if existing else None
+
+
+def data_file_exists(path):
+    """
+    Check whether any variant of a data file exists.
+
+    Args:
+        path (str): The plain path of the data file.
+
+    Returns:
+        bool: True if the file exists, plain or compressed.
+    """
+    return find_data_file(path) is not None
+
+
+def read_json(path):
+    """
+    Load JSON data from a data file, decompressing it if needed.
+
+    Args:
+        path (str): The plain path of the data file, or the path of a specific variant.
+
+    Returns:
+        The decoded JSON data.
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist.
+        json.JSONDecodeError: If the file doesn't contain valid JSON.
+    """
+    physical_path = find_data_file(path)
+    if physical_path is None:
+        raise FileNotFoundError(path)
+
+    with _open(physical_path, 'rb') as jsonfile:
+        return loads(jsonfile.read())
+
+
+def write_json(path, data, pretty=False):
+    """
+    Save JSON data to a data file. An existing file keeps the way it is stored,
+    a new file uses the default compression from `config.py`.
+
+    Args:
+        path (str): The plain path of the data file, or the path of a specific variant.
+        data: The data to be saved.
+        pretty (bool): If True, indent the JSON for files read or edited by hand.
+                       Otherwise it is written compact.
+    """
+    content = dumps(data, pretty)
+    with lock_data_file(path):
+        physical_path = find_data_file(path)
+        if physical_path is None:
+            compression = _resolve_compression(DATA_COMPRESSION)
+            physical_path = path + COMPRESSION_SUFFIXES.get(compression, '')
+
+        _write_atomic(physical_path, content)
+
+
+def _write_atomic(physical_path, content):
+    suffix = physical_path[len(_strip_suffix(physical_path)):]
+    file_descriptor, temp_path = tempfile.mkstemp(
+        prefix='.tmp-', suffix=suffix, dir=os.path.dirname(physical_path) or '.')
+    os.close(file_descriptor)
+    try:
+        os.chmod(temp_path, os.stat(physical_path).st_mode
+                 if os.path.isfile(physical_path) else 0o644)
+        with _open(temp_path, 'wb') as jsonfile:
+            jsonfile.write(content)
+        os.replace(temp_path, physical_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+@contextmanager
+def lock_data_file(path):
+    """
+    Hold an exclusive advisory lock on a data file for the duration of a
+    read-modify-write. The lock is taken on a `.lock` file next to the data
+    file, so it covers every stored variant and survives atomic replacement.
+    A thread that already holds the lock can take it again.
+
+    Args:
+        path (str): The plain path of the data file, or the path of a specific variant.
+    """
+    lock_path = _strip_suffix(path) + '.lock'
+    held = getattr(_held_locks, 'paths', None)
+    if held is None:
+        held = _held_locks.paths = set()
+    if lock_path in held:
+        yield
+        return
+
+    with open(lock_path, 'a+', encoding='utf-8') as lockfile:
+        if fcntl is not None:
+            fcntl.flock(lockfile.fileno(), fcntl.LOCK_EX)
+        else:
+            _lock_windows(lockfile)
+        held.add(lock_path)
+        try:
+            yield
+        finally:
+            held.discard(lock_path)
+            if fcntl is not None:
+                fcntl.flock(lockfile.fileno(), fcntl.LOCK_UN)
+            else:
+                lockfile.seek(0)
+                msvcrt.locking(lockfile.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _lock_windows(lockfile):
+    # LK_LOCK gives up with EDEADLOCK after ten one-second attempts, so keep
+    # trying until the lock is free, like flock does.
+    lockfile.seek(0)
+    while True:
+        try:
+            msvcrt.locking(lockfile.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError as error:
+            if error.errno != errno.EDEADLOCK:
+                raise
+
+
+def migrate_data_files(compression):
+    """
+    Convert every JSON data file in the data directory to the given compression.
+    Each file is locked while it is converted, so scans can keep running.
+
+    Args:
+        compression (str or None): 'gzip', 'zstd', or None for plain JSON.
+    """
+    compression = _resolve_compression(compression)
+    suffix = COMPRESSION_SUFFIXES.get(compression, '')
+    num_migrated = 0
+
+    for root, _dirs, files in os.walk(DATA_DIR):
+        for file in files:
+            physical_path = os.path.join(root, file)
+            path = _strip_suffix(physical_path)
+            if (not path.endswith('.json') or file.startswith('.tmp-')
+                    or physical_path == path + suffix):
+                continue
+
+            with lock_data_file(path):
+                if not os.path.isfile(physical_path):
+                    continue
+                with _open(physical_path, 'rb') as jsonfile:
+                    content = jsonfile.read()
+                _write_atomic(path + suffix, content)
+                os.remove(physical_path)
+            num_migrated += 1
+
+    file_word = "file" if num_migrated == 1 else "files"
+    print(f"Migrated {num_migrated} data {file_word} to {compression or 'plain JSON'}.")
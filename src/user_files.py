@@ -0,0 +1,49 @@
+# user_files.py
+"""
+Listing and parsing of user JSON files for the Steam Completionist project.
+
+This module is kept free of Steam API imports, so it can be used by process pool
+workers and the scheduler without importing the Steam libraries.
+
+Functions:
+    - list_user_json_files(): List all user JSON files in the data directory.
+    - read_user_entries(json_file): Read a single user JSON file into GameRecord objects.
+
+Dependencies:
+    - game_record: Compact record type for a single game.
+    - storage: Reading and writing of (optionally compressed) JSON data files.
+"""
+
+import os
+from game_record import GameRecord
+from storage import read_json
+
+DATA_DIR = 'data'
+USER_JSON_EXTENSIONS = ('json', 'json.gz', 'json.zst')
+
+def list_user_json_files():
+    """
+    List all user JSON files in the data directory.
+
+    Returns:
+        list: List of file paths to user JSON files in the data directory.
+    """
+    user_json_files = []
+    for root, _dirs, files in os.walk(DATA_DIR):
+        for file in files:
+            if file.startswith("7") and file.split('.', 1)[-1] in USER_JSON_EXTENSIONS:
+                user_json_files.append(os.path.join(root, file))
+    return user_json_files
+
+
+def read_user_entries(json_file):
+    """
+    Read a user JSON file into GameRecord objects.
+
+    Args:
+        json_file (str): Path to the user JSON file.
+
+    Returns:
+        list: List of GameRecord objects, one per game in the file.
+    """
+    return [GameRecord.from_dict(entry) for entry in read_json(json_file)]
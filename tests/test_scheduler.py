@@ -0,0 +1,82 @@
+# test_scheduler.py
+"""
+Tests for the adaptive polling schedule in `scheduler.py`.
+
+Run from the repository root with:
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from scheduler import (  # pylint: disable=wrong-import-position
+    DEFAULT_INTERVAL, MAX_INTERVAL, build_queue, add_new_users, reschedule_user)
+
+TICK = 15 * 60
+
+
+def make_games(appids):
+    return [{'appid': appid, 'rtime_last_played': 0} for appid in appids]
+
+
+class RescheduleUserTest(unittest.TestCase):
+    def test_backlog_keeps_interval_until_cleared(self):
+        schedule = {}
+        owned_games = make_games(range(10))
+        new_games = list(owned_games)
+        now = 0
+
+        # The first check finds ten new games but only has budget for three per tick.
+        intervals = []
+        while new_games:
+            scanned_games = new_games[:3]
+            reschedule_user(schedule, 'user', owned_games, new_games, scanned_games, now)
+            intervals.append(schedule['user']['interval'])
+            self.assertEqual(schedule['user']['pending'],
+                             sorted(game['appid'] for game in new_games[3:]))
+            new_games = new_games[3:]
+            now += TICK
+
+        self.assertEqual(intervals, [DEFAULT_INTERVAL // 2] * 4)
+
+        # The backlog is cleared, so the next idle check backs off as usual.
+        reschedule_user(schedule, 'user', owned_games, [], [], now)
+        self.assertEqual(schedule['user']['interval'], DEFAULT_INTERVAL)
+        self.assertEqual(schedule['user']['pending'], [])
+
+    def test_new_games_during_backlog_shorten_interval(self):
+        schedule = {'user': {'next_check': 0, 'interval': DEFAULT_INTERVAL,
+                             'last_played': 0, 'pending': [1, 2]}}
+        owned_games = make_games([1, 2, 3])
+
+        reschedule_user(schedule, 'user', owned_games, owned_games, owned_games[:1], 0)
+
+        self.assertEqual(schedule['user']['interval'], DEFAULT_INTERVAL // 2)
+        self.assertEqual(schedule['user']['pending'], [2, 3])
+
+    def test_idle_user_backs_off_to_max_interval(self):
+        schedule = {}
+        owned_games = make_games([1])
+        for _ in range(5):
+            reschedule_user(schedule, 'user', owned_games, [], [], 0)
+
+        self.assertEqual(schedule['user']['interval'], MAX_INTERVAL)
+
+
+
+class AddNewUsersTest(unittest.TestCase):
+    def test_only_users_missing_from_queue_are_added(self):
+        schedule = {'old': {'next_check': 100}}
+        queue = build_queue(schedule, ['old'])
+        schedule['returning'] = {'next_check': 50}
+
+        add_new_users(queue, schedule, ['old', 'new', 'returning'])
+
+        self.assertEqual(sorted(queue), [(0, 'new'), (50, 'returning'), (100, 'old')])
+
+
+if __name__ == '__main__':
+    unittest.main()